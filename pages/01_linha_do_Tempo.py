@@ -1,7 +1,8 @@
 import streamlit as st
-import pandas as pd
 import streamlit.components.v1 as components
 
+from timeline_utils import load_data, generate_timeline_html
+
 # Configuração da página
 st.set_page_config(
     page_title="Linha do Tempo de Geografia",
@@ -19,59 +20,6 @@ SOURCES = {
     "Líderes do Brasil": {"gid": "918682842", "type": "leaders"}
 }
 
-# Função para carregar os dados
-@st.cache_data(ttl=600)
-def load_data(url):
-    try:
-        df = pd.read_csv(url)
-        df.dropna(how='all', inplace=True)
-        return df
-    except Exception as e:
-        st.error(f"Não foi possível carregar os dados da planilha. Verifique o link, o GID e as permissões de compartilhamento. Erro: {e}")
-        return pd.DataFrame()
-
-# --- Função de Geração de HTML para a Linha do Tempo ---
-
-def generate_timeline_html(df):
-    """Gera o código HTML para a linha do tempo visual a partir de um DataFrame."""
-    timeline_css = """
-    <style>
-        body { font-family: 'Inter', sans-serif; margin: 0; padding: 0; }
-        .timeline-container { position: relative; padding: 2rem 0; max-width: 1000px; margin: 0 auto; }
-        .timeline-container::before { content: ''; position: absolute; top: 0; left: 50%; transform: translateX(-50%); width: 3px; height: 100%; background-color: #D1D5DB; }
-        .timeline-item { padding: 10px 40px; position: relative; width: 50%; box-sizing: border-box; }
-        .timeline-item.left { left: 0; }
-        .timeline-item.right { left: 50%; }
-        .timeline-item::after { content: ''; position: absolute; width: 20px; height: 20px; right: -10px; background-color: white; border: 4px solid #FF9F55; top: 25px; border-radius: 50%; z-index: 1; }
-        .timeline-item.right::after { left: -10px; }
-        .timeline-content { padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1); }
-        .timeline-content h2 { font-size: 1.25rem; font-weight: bold; color: #374151; }
-        .timeline-content p { font-size: 0.9rem; line-height: 1.6; color: #4B5563; }
-        .timeline-date { font-size: 0.875rem; font-weight: 500; color: #6B7280; margin-bottom: 0.5rem; }
-        .timeline-theme { display: inline-block; background-color: #FFF7ED; color: #FB923C; padding: 0.25rem 0.75rem; border-radius: 9999px; font-size: 0.75rem; font-weight: 500; margin-top: 1rem; }
-        @media screen and (max-width: 768px) {
-            .timeline-container::before { left: 10px; }
-            .timeline-item { width: 100%; padding-left: 50px; padding-right: 10px; }
-            .timeline-item.left, .timeline-item.right { left: 0%; }
-            .timeline-item.left::after, .timeline-item.right::after { left: 1px; }
-        }
-    </style>
-    """
-    items_html = ""
-    for index, row in df.iterrows():
-        position = "left" if index % 2 == 0 else "right"
-        items_html += f"""
-        <div class="timeline-item {position}">
-            <div class="timeline-content">
-                <div class="timeline-date">{row['Data']}</div>
-                <h2>{row['Titulo']}</h2>
-                <p>{row['Descricao']}</p>
-                <div class="timeline-theme">{row['Tema']}</div>
-            </div>
-        </div>
-        """
-    return f"<html><head>{timeline_css}</head><body><div class='timeline-container'>{items_html}</div></body></html>"
-
 # --- Interface Principal ---
 
 st.title("🌍 Linha do Tempo e Análises Geográficas")
@@ -84,37 +32,53 @@ selected_source_name = st.sidebar.radio(
 
 source_info = SOURCES[selected_source_name]
 selected_url = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={source_info['gid']}"
-df = load_data(selected_url)
+df, todos_temas = load_data(selected_url, source_info['gid'])
 
 st.markdown(f"### Visualizando: **{selected_source_name}**")
 
 if not df.empty:
     # --- Lógica para adaptar os dados e criar filtros ---
-    
+
     st.sidebar.header("Filtros")
-    
-    if source_info['type'] == 'timeline':
-        df.columns = ['Data', 'Titulo', 'Descricao', 'Tema']
-        filter_column = 'Tema'
+
+    # As colunas já são normalizadas em load_data; aqui só muda o rótulo do filtro
+    if source_info['type'] == 'leaders':
+        filter_label = "Selecione um Período:"  # 'Períodos' vira o 'Tema'
+    else:
         filter_label = "Selecione um Tema:"
-        
-    elif source_info['type'] == 'leaders':
-        df.columns = ['Data', 'Titulo', 'Descricao', 'Tema'] # 'Períodos' vira o 'Tema'
-        filter_column = 'Tema'
-        filter_label = "Selecione um Período:"
-
-    # Cria o filtro com base na coluna definida
-    filter_values = df[filter_column].dropna().unique()
-    filter_options = ["Todos"] + sorted(list(filter_values))
-    selected_filter = st.sidebar.selectbox(filter_label, options=filter_options)
-
-    # Aplica o filtro
-    if selected_filter == "Todos":
+
+    # Cria o filtro com os temas individuais já calculados no carregamento
+    selected_filter = st.sidebar.multiselect(filter_label, options=todos_temas)
+    search_query = st.sidebar.text_input("Buscar por palavra-chave:")
+
+    # Aplica os filtros (nenhuma seleção = mostra tudo). Cada combinação de
+    # fonte + temas + busca é memorizada na sessão: repetir a mesma seleção
+    # (ex.: apagar uma letra da busca) reaproveita o resultado sem refazer as máscaras.
+    query = search_query.strip().lower()
+    # Busca com 1 caractere casa com quase tudo e forçaria uma varredura
+    # completa já na primeira tecla; só filtra a partir de 2 caracteres
+    if len(query) < 2:
+        query = ''
+    if not selected_filter and not query:
+        # Sem filtro nenhum: devolve o DataFrame já ordenado, sem máscaras
         filtered_df = df
     else:
-        filtered_df = df[df[filter_column] == selected_filter]
-    
-    st.markdown(f"Exibindo itens para: **{selected_filter}**")
+        filter_cache = st.session_state.setdefault('filter_cache', {})
+        cache_key = (selected_source_name, tuple(selected_filter), query)
+        if cache_key in filter_cache:
+            filtered_df = filter_cache[cache_key]
+        else:
+            filtered_df = df
+            if selected_filter:
+                indice_temas = df.attrs['indice_temas']
+                colunas = [indice_temas[t] for t in selected_filter]
+                mask = df.attrs['matriz_temas'][:, colunas].any(axis=1)
+                filtered_df = filtered_df[mask]
+            if query:
+                filtered_df = filtered_df[filtered_df['BuscaLc'].str.contains(query, regex=False, na=False)]
+            filter_cache[cache_key] = filtered_df
+
+    st.markdown(f"Exibindo itens para: **{', '.join(selected_filter) if selected_filter else 'Todos'}**")
 
     # --- Renderização ---
     if not filtered_df.empty:
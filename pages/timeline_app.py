@@ -1 +0,0 @@
-pip install streamlit pandas
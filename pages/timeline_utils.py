@@ -0,0 +1,201 @@
+"""Funções compartilhadas de carga de dados e geração de HTML da linha do tempo."""
+
+import io
+import os
+import pickle
+import re
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import requests
+
+# Cache em disco dos bytes brutos do CSV, revalidado por ETag
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".streamlit", "cache")
+
+# Padrões compilados uma única vez na importação do módulo; as chamadas
+# vetorizadas abaixo recebem o objeto compilado, sem nova consulta ao
+# cache do módulo re a cada carregamento
+_ANO_RE = re.compile(r'(\d{4})')
+_SEPARADOR_TEMAS_RE = re.compile(r'\s*(?:\s+e\s+|[,;/&])\s*')
+
+
+@st.cache_resource
+def get_http_session():
+    return requests.Session()
+
+
+def fetch_csv_bytes(url, cache_key):
+    """Baixa o CSV da planilha revalidando por ETag: um 304 (ou uma falha de
+    rede) reaproveita os bytes guardados em disco e pula download e parse."""
+    cache_path = os.path.join(CACHE_DIR, f"sheet_{cache_key}.bin")
+    etag, cached = None, None
+    try:
+        with open(cache_path, 'rb') as f:
+            etag, cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+    headers = {'If-None-Match': etag} if etag else {}
+    try:
+        resp = get_http_session().get(url, headers=headers, timeout=30)
+    except requests.RequestException:
+        if cached is not None:
+            return cached
+        raise
+    if resp.status_code == 304 and cached is not None:
+        return cached
+    resp.raise_for_status()
+    data = resp.content
+    new_etag = resp.headers.get('ETag')
+    if new_etag:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                pickle.dump((new_etag, data), f)
+        except OSError:
+            pass
+    return data
+
+
+# Tabela de tradução para escapar HTML numa única passagem por coluna
+HTML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
+# Função para carregar os dados; devolve também a lista ordenada de temas,
+# calculada uma vez aqui dentro (cacheada) em vez de refeita a cada rerun.
+# persist='disk' mantém o resultado entre reinícios do processo; o ETag do
+# fetch_csv_bytes cobre a revalidação quando o TTL expira.
+@st.cache_data(ttl=3600, persist="disk", show_spinner=False)
+def load_data(url, cache_key):
+    todos_temas = ()
+    try:
+        # O parser do pyarrow lê em paralelo e devolve colunas de texto Arrow,
+        # mais rápidas e compactas nas operações .str usadas abaixo
+        df = pd.read_csv(io.BytesIO(fetch_csv_bytes(url, cache_key)),
+                         engine="pyarrow", dtype_backend="pyarrow")
+        df.dropna(how='all', inplace=True)
+        if not df.empty:
+            df.columns = ['Data', 'Titulo', 'Descricao', 'Tema']
+            # Extrai o primeiro ano da coluna 'Data' numa única passagem
+            # vetorizada (regex em C), em vez de uma chamada Python por linha.
+            # Linhas sem ano recebem o sentinela int16 máximo e vão para o
+            # final; anos de 4 dígitos cabem folgados em int16.
+            anos = df['Data'].astype('string').str.extract(_ANO_RE, expand=False)
+            df['AnoChave'] = anos.fillna('32767').astype('int16')
+            # Ordena uma única vez no carregamento (ano, com título como
+            # desempate) direto sobre os arrays com np.lexsort; os filtros
+            # depois só mascaram e preservam esta ordem, sem reordenar nada.
+            ordem = np.lexsort((
+                df['Titulo'].astype('string').fillna('').to_numpy(),
+                df['AnoChave'].to_numpy(),
+            ))
+            df = df.iloc[ordem].reset_index(drop=True)
+            # 'Tema' pode listar vários temas ("A e B", "A, B", "A/B").
+            # Normaliza todos os separadores para um caractere sentinela numa
+            # passagem vetorizada e divide com um único split literal por linha.
+            temas = df['Tema'].astype('string').fillna('').str.strip()
+            df['ListaTemas'] = (
+                temas.str.replace(_SEPARADOR_TEMAS_RE, '\x1f', regex=True)
+                     .str.split('\x1f')
+            )
+            # Matriz multi-hot densa (linhas x temas), montada uma vez no
+            # carregamento: filtrar por temas vira uma redução any() sobre
+            # colunas numpy contíguas, sem percorrer listas Python por linha.
+            # Artefatos devolvidos imutáveis: tupla de temas e matriz numpy
+            # congelada, para que nenhum consumidor altere o que está em cache
+            todos_temas = tuple(sorted({t for lst in df['ListaTemas'] for t in lst if t}))
+            indice_temas = {t: j for j, t in enumerate(todos_temas)}
+            matriz_temas = np.zeros((len(df), len(todos_temas)), dtype=bool)
+            for i, lst in enumerate(df['ListaTemas']):
+                for t in lst:
+                    j = indice_temas.get(t)
+                    if j is not None:
+                        matriz_temas[i, j] = True
+            matriz_temas.flags.writeable = False
+            df.attrs['matriz_temas'] = matriz_temas
+            df.attrs['indice_temas'] = indice_temas
+            # Índice de busca: as quatro colunas de texto concatenadas e já em
+            # minúsculas, calculado uma vez aqui (cacheado) em vez de quatro
+            # passagens de .lower() a cada tecla digitada na busca.
+            df['BuscaLc'] = (
+                df['Titulo'].astype('string').fillna('') + '\x1f'
+                + df['Descricao'].astype('string').fillna('') + '\x1f'
+                + df['Data'].astype('string').fillna('') + '\x1f'
+                + df['Tema'].astype('string').fillna('')
+            ).str.lower()
+            # Temas já juntados na string exibida no selo do cartão,
+            # calculados uma vez aqui em vez de um join por linha por render
+            df['TemasDisplay'] = [' • '.join(t for t in lst if t) for lst in df['ListaTemas']]
+            # Prévia da descrição truncada uma única vez aqui, de forma
+            # vetorizada, em vez de fatiar a string de cada linha (e medir o
+            # comprimento de novo) a cada renderização
+            desc = df['Descricao'].astype('string').fillna('')
+            df['DescricaoPrevia'] = desc.where(desc.str.len() <= 160,
+                                               desc.str.slice(0, 160) + '...')
+            # Versões já escapadas das colunas exibidas, prontas para
+            # interpolar direto no HTML dos cartões: uma passagem de
+            # str.translate por coluna aqui, nenhum escape por linha na
+            # renderização (e texto vindo da planilha deixa de virar HTML)
+            for col in ('Data', 'Titulo', 'DescricaoPrevia', 'TemasDisplay'):
+                df[col + 'Html'] = (
+                    df[col].astype('string').fillna('').str.translate(HTML_ESCAPE_TABLE)
+                )
+        return df, todos_temas
+    except Exception as e:
+        st.error(f"Não foi possível carregar os dados da planilha. Verifique o link, o GID e as permissões de compartilhamento. Erro: {e}")
+        return pd.DataFrame(), todos_temas
+
+
+# --- Função de Geração de HTML para a Linha do Tempo ---
+
+# CSS estático definido uma única vez no módulo, em vez de reconstruir a
+# string a cada chamada de generate_timeline_html
+TIMELINE_CSS = """
+    <style>
+        body { font-family: 'Inter', sans-serif; margin: 0; padding: 0; }
+        .timeline-container { position: relative; padding: 2rem 0; max-width: 1000px; margin: 0 auto; }
+        .timeline-container::before { content: ''; position: absolute; top: 0; left: 50%; transform: translateX(-50%); width: 3px; height: 100%; background-color: #D1D5DB; }
+        .timeline-item { padding: 10px 40px; position: relative; width: 50%; box-sizing: border-box; }
+        .timeline-item.left { left: 0; }
+        .timeline-item.right { left: 50%; }
+        .timeline-item::after { content: ''; position: absolute; width: 20px; height: 20px; right: -10px; background-color: white; border: 4px solid #FF9F55; top: 25px; border-radius: 50%; z-index: 1; }
+        .timeline-item.right::after { left: -10px; }
+        .timeline-content { padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1); }
+        .timeline-content h2 { font-size: 1.25rem; font-weight: bold; color: #374151; }
+        .timeline-content p { font-size: 0.9rem; line-height: 1.6; color: #4B5563; }
+        .timeline-date { font-size: 0.875rem; font-weight: 500; color: #6B7280; margin-bottom: 0.5rem; }
+        .timeline-theme { display: inline-block; background-color: #FFF7ED; color: #FB923C; padding: 0.25rem 0.75rem; border-radius: 9999px; font-size: 0.75rem; font-weight: 500; margin-top: 1rem; }
+        @media screen and (max-width: 768px) {
+            .timeline-container::before { left: 10px; }
+            .timeline-item { width: 100%; padding-left: 50px; padding-right: 10px; }
+            .timeline-item.left, .timeline-item.right { left: 0%; }
+            .timeline-item.left::after, .timeline-item.right::after { left: 1px; }
+        }
+    </style>
+    """
+
+
+def generate_timeline_html(df):
+    """Gera o código HTML para a linha do tempo visual a partir de um DataFrame."""
+    # Acumula os cartões numa lista e junta no final: um único "".join
+    # cresce linearmente, em vez da realocação quadrática do += em strings
+    parts = []
+    # zip sobre os arrays das colunas evita construir uma Series por linha
+    # (iterrows); enumerate também corrige a alternância esquerda/direita
+    # quando o índice deixa de ser sequencial após um filtro
+    linhas = zip(df['DataHtml'].to_numpy(), df['TituloHtml'].to_numpy(),
+                 df['DescricaoPreviaHtml'].to_numpy(), df['TemasDisplayHtml'].to_numpy())
+    for i, (data, titulo, descricao, tema) in enumerate(linhas):
+        position = "left" if i % 2 == 0 else "right"
+        parts.append(f"""
+        <div class="timeline-item {position}">
+            <div class="timeline-content">
+                <div class="timeline-date">{data}</div>
+                <h2>{titulo}</h2>
+                <p>{descricao}</p>
+                <div class="timeline-theme">{tema}</div>
+            </div>
+        </div>
+        """)
+    items_html = "".join(parts)
+    return f"<html><head>{TIMELINE_CSS}</head><body><div class='timeline-container'>{items_html}</div></body></html>"